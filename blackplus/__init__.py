@@ -8,9 +8,10 @@ from blackplus.cli import main as cli_main
 from blackplus.formatter import (
     format_file,
     format_files,
+    format_source,
     read_config,
 )
 
 __version__ = "0.1.0"
 
-__all__ = ["format_file", "format_files", "read_config", "cli_main"]
+__all__ = ["format_file", "format_files", "format_source", "read_config", "cli_main"]
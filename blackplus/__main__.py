@@ -6,5 +6,13 @@ This module allows running the BlackPlus package as a script.
 
 from blackplus.cli import main
 
-if __name__ == "__main__":
+
+def _entry():
+    """
+    Run the BlackPlus command line interface.
+    """
     main()
+
+
+if __name__ == "__main__":
+    _entry()
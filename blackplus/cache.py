@@ -0,0 +1,173 @@
+"""
+blackplus/cache.py
+
+This module keeps track of the files BlackPlus has already formatted, so that
+files which have not changed since the last run can be skipped.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Dict, List
+
+
+def get_cache_dir() -> str:
+    """
+    Get the directory the cache files are stored in.
+
+    The BLACKPLUS_CACHE_DIR environment variable takes precedence over
+    $XDG_CACHE_HOME/blackplus and ~/.cache/blackplus.
+
+    Returns:
+    str: Path of the cache directory.
+    """
+    cache_dir = os.environ.get("BLACKPLUS_CACHE_DIR")
+    if cache_dir:
+        return cache_dir
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache_home, "blackplus")
+
+
+def hash_file(file_path: str) -> str:
+    """
+    Hash the content of a file.
+
+    Parameters:
+    file_path (str): Path of the file.
+
+    Returns:
+    str: Hexadecimal digest of the file content.
+    """
+    with open(file_path, "rb") as file:
+        return hashlib.blake2b(file.read(), digest_size=16).hexdigest()
+
+
+def file_entry(file_path: str) -> List[Any]:
+    """
+    Describe the current state of a file for the cache.
+
+    Parameters:
+    file_path (str): Path of the file.
+
+    Returns:
+    List[Any]: Modification time in nanoseconds, size, and content hash.
+    """
+    stat = os.stat(file_path)
+    return [stat.st_mtime_ns, stat.st_size, hash_file(file_path)]
+
+
+class Cache:
+    """
+    The set of formatted files for one configuration.
+
+    Results depend on the configuration and on the black and isort versions,
+    so each combination of them gets its own cache file.
+
+    Like black's own cache, a file whose modification time and size are
+    unchanged is taken to be unchanged, so that only files that were
+    touched need to be read and hashed.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Load the cache for the provided configuration.
+
+        Parameters:
+        config (Dict[str, Any]): Configuration dictionary.
+        """
+        # Imported here, as the package imports the CLI and formatter first,
+        # and as black and isort are slow to import.
+        # pylint: disable=import-outside-toplevel
+        import black
+        import isort
+
+        from blackplus import __version__
+
+        key = json.dumps(
+            [__version__, black.__version__, isort.__version__, config],
+            sort_keys=True,
+            default=str,
+        )
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+        self.path = os.path.join(get_cache_dir(), f"cache.{digest}.json")
+        self.entries: Dict[str, List[Any]] = self._read()
+
+    def _read(self) -> Dict[str, List[Any]]:
+        """
+        Read the cache file, treating a missing or corrupt file as empty.
+
+        Returns:
+        Dict[str, List[Any]]: Entries of formatted files by absolute path.
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as cache_file:
+                entries = json.load(cache_file)
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def is_formatted(self, file_path: str) -> bool:
+        """
+        Check whether a file is unchanged since it was last formatted.
+
+        Parameters:
+        file_path (str): Path of the file.
+
+        Returns:
+        bool: True if the file matches its cache entry.
+        """
+        entry = self.entries.get(os.path.abspath(file_path))
+        if not isinstance(entry, list) or len(entry) != 3:
+            return False
+        mtime_ns, size, cached_hash = entry
+        try:
+            stat = os.stat(file_path)
+            if stat.st_size != size:
+                return False
+            if stat.st_mtime_ns == mtime_ns:
+                return True
+            if hash_file(file_path) != cached_hash:
+                return False
+        except OSError:
+            return False
+        # Touched but unchanged, remember the new time to skip hashing later.
+        entry[0] = stat.st_mtime_ns
+        return True
+
+    def update(self, file_paths: List[str]) -> None:
+        """
+        Record the current content of freshly formatted files.
+
+        Parameters:
+        file_paths (List[str]): Paths of the formatted files.
+        """
+        for file_path in file_paths:
+            try:
+                self.entries[os.path.abspath(file_path)] = file_entry(file_path)
+            except OSError:
+                continue
+
+    def write(self) -> None:
+        """
+        Write the cache file, replacing it atomically.
+
+        The cache is only an optimization, so a cache directory that cannot
+        be written to is ignored rather than failing the run.
+        """
+        cache_dir = os.path.dirname(self.path)
+        temp_path = None
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=cache_dir, delete=False
+            ) as temp_file:
+                temp_path = temp_file.name
+                json.dump(self.entries, temp_file)
+            os.replace(temp_path, self.path)
+        except OSError:
+            if temp_path is not None:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
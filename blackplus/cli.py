@@ -8,7 +8,7 @@ import argparse
 import logging
 import os
 import sys
-from typing import List
+from typing import Iterator, List
 
 from blackplus.formatter import format_files, read_config
 
@@ -24,6 +24,25 @@ def setup_logging():
     )
 
 
+def positive_int(value: str) -> int:
+    """
+    Parse a command line value that must be a positive integer.
+
+    Parameters:
+    value (str): The value given on the command line.
+
+    Returns:
+    int: The parsed value.
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer: {value!r}")
+    return number
+
+
 def parse_arguments() -> argparse.Namespace:
     """
     Parse command-line arguments for BlackPlus.
@@ -40,9 +59,67 @@ def parse_arguments() -> argparse.Namespace:
         default="pyproject.toml",
         help="Path to the configuration file (default: pyproject.toml)",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=positive_int,
+        default=os.cpu_count(),
+        help="Number of files to format in parallel (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Format all files, including those unchanged since the last run",
+    )
     return parser.parse_args()
 
 
+def _iter_directory(directory: str) -> Iterator[str]:
+    """
+    Recursively yield the Python files in a directory.
+
+    Like os.walk, the files of a directory come before those of its
+    subdirectories, symbolic links to directories are not followed, and
+    unreadable directories are skipped.
+
+    Parameters:
+    directory (str): Path of the directory to search.
+
+    Yields:
+    str: Path of a Python file.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            subdirectories = []
+            for entry in entries:
+                if entry.is_dir():
+                    if not entry.is_symlink():
+                        subdirectories.append(entry.path)
+                elif entry.name.endswith(".py"):
+                    yield entry.path
+    except OSError:
+        return
+    for subdirectory in subdirectories:
+        yield from _iter_directory(subdirectory)
+
+
+def iter_python_files(paths: List[str]) -> Iterator[str]:
+    """
+    Lazily find all Python files in the given paths.
+
+    Parameters:
+    paths (List[str]): List of file or directory paths.
+
+    Yields:
+    str: Path of a Python file.
+    """
+    for path in paths:
+        if os.path.isfile(path) and path.endswith(".py"):
+            yield path
+        elif os.path.isdir(path):
+            yield from _iter_directory(path)
+
+
 def get_python_files(paths: List[str]) -> List[str]:
     """
     Recursively find all Python files in the given paths.
@@ -53,16 +130,7 @@ def get_python_files(paths: List[str]) -> List[str]:
     Returns:
     List[str]: List of Python file paths.
     """
-    python_files = []
-    for path in paths:
-        if os.path.isfile(path) and path.endswith(".py"):
-            python_files.append(path)
-        elif os.path.isdir(path):
-            for root, _, files in os.walk(path):
-                for file in files:
-                    if file.endswith(".py"):
-                        python_files.append(os.path.join(root, file))
-    return python_files
+    return list(iter_python_files(paths))
 
 
 def main():
@@ -90,7 +158,7 @@ def main():
     logging.info("Found %d Python files to format.", len(python_files))
 
     try:
-        format_files(python_files, config)
+        format_files(python_files, config, jobs=args.jobs, use_cache=not args.no_cache)
         logging.info("Formatting completed successfully.")
     except (IOError, OSError) as e:
         logging.error("An error occurred during file I/O: %s", str(e))
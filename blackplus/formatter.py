@@ -6,16 +6,50 @@ including docstring processing and code formatting using black and isort.
 """
 
 import ast
-import tempfile
+import inspect
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from functools import lru_cache
 from pathlib import Path
-from textwrap import wrap, dedent
-from typing import Any, Dict, List, Optional
+from textwrap import TextWrapper, dedent, indent
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
 
-import black
-import isort
-# pylint: disable=import-error
-import toml
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    # pylint: disable=import-error
+    import tomli as tomllib
+
+from blackplus.cache import Cache
+
+if TYPE_CHECKING:
+    import black
+
+# black and isort take most of the time needed to import this module, so
+# they are only imported by the functions that use them, when called.
+# pylint: disable=import-outside-toplevel
+
+
+@lru_cache(maxsize=16)
+def _load_config(config_path: str, mtime_ns: int) -> Dict[str, Any]:
+    """
+    Parse the BlackPlus section of a TOML file.
+
+    Results are cached by path and modification time, so that reading the
+    same unchanged file again does not parse it again.
+
+    Parameters:
+    config_path (str): Path to the pyproject.toml file.
+    mtime_ns (int): Modification time of the file, part of the cache key.
+
+    Returns:
+    Dict[str, Any]: Parsed configuration dictionary.
+    """
+    with open(config_path, "rb") as config_file:
+        config = tomllib.load(config_file)
+    return config.get("tool", {}).get("blackplus", {})
 
 
 def read_config(config_path: str = "pyproject.toml") -> Dict[str, Any]:
@@ -28,9 +62,9 @@ def read_config(config_path: str = "pyproject.toml") -> Dict[str, Any]:
     Returns:
     Dict[str, Any]: Parsed configuration dictionary.
     """
-    with open(config_path, "r", encoding="utf-8") as config_file:
-        config = toml.load(config_file)
-    return config.get("tool", {}).get("blackplus", {})
+    mtime_ns = os.stat(config_path).st_mtime_ns
+    # Callers get their own copy, so that they cannot alter the cached one.
+    return deepcopy(_load_config(os.path.abspath(config_path), mtime_ns))
 
 
 # pylint: disable=too-few-public-methods
@@ -48,6 +82,38 @@ class DocstringFormatter:
         """
         self.config = config.get("docstrings", {})
         self.sections = self.config.get("sections", [])
+        self._black_mode: Optional["black.Mode"] = None
+
+        # Formatting is a pure function of the configuration, and the same
+        # docstrings and code examples tend to recur across a code base.
+        self._cache: Dict[str, str] = {}
+        self._raw_cache: Dict[str, Optional[str]] = {}
+        self._wrappers: Dict[int, TextWrapper] = {}
+        self._format_code_snippet = lru_cache(maxsize=4096)(self._format_code_snippet)
+
+        # Marker lookups, built once so that identifying the section of a
+        # line does not loop over every section in Python.
+        self._empty_section = next(
+            (section for section in self.sections if section["marker"] == ""), None
+        )
+        self._marker_map: Dict[str, Dict[str, Any]] = {}
+        for section in self.sections:
+            if section["marker"]:
+                self._marker_map.setdefault(section["marker"], section)
+        self._marker_re = (
+            re.compile("|".join(map(re.escape, self._marker_map)))
+            if self._marker_map
+            else None
+        )
+        # Most lines are not section headers, and a set lookup of their first
+        # character rules them out without calling into the regex engine.
+        self._marker_initials = frozenset(marker[0] for marker in self._marker_map)
+
+        # Wrappers for the configured widths are built up front, so that the
+        # per-line wrapping path only ever finds them.
+        for section in self.sections:
+            if "code_example" not in section:
+                self._get_wrapper(section.get("width", 72))
 
     def format_docstring(self, docstring: str) -> str:
         """
@@ -59,49 +125,91 @@ class DocstringFormatter:
         Returns:
         str: The formatted docstring.
         """
-        lines = docstring.split("\n")
-        formatted_sections = []
+        cached = self._cache.get(docstring)
+        if cached is not None:
+            return cached
+
+        # splitlines also handles Windows line endings
+        lines = docstring.splitlines()
+        # A substring search in C rules out most docstrings, which have no
+        # marker anywhere and hence form a single section.
+        if not any(marker in docstring for marker in self._marker_map):
+            result = self._format_section(self._empty_section, lines).strip()
+        else:
+            result = "\n\n".join(
+                section for section in self._iter_formatted_sections(lines) if section
+            ).strip()
+        self._cache[docstring] = result
+        return result
+
+    def format_raw_docstring(self, raw_docstring: str) -> Optional[str]:
+        """
+        Format a docstring as it appears in the source, before cleaning.
+
+        Results are cached by the raw text, so that a docstring seen before
+        is neither cleaned with inspect.cleandoc nor formatted again.
+
+        Parameters:
+        raw_docstring (str): The value of the docstring literal.
+
+        Returns:
+        Optional[str]: The formatted docstring, or None if it is empty.
+        """
+        try:
+            return self._raw_cache[raw_docstring]
+        except KeyError:
+            pass
+        docstring = inspect.cleandoc(raw_docstring)
+        result = self.format_docstring(docstring) if docstring else None
+        self._raw_cache[raw_docstring] = result
+        return result
+
+    def _iter_formatted_sections(self, lines: List[str]) -> Iterator[str]:
+        """
+        Split docstring lines into sections and format them one by one.
+
+        Parameters:
+        lines (List[str]): The lines of the docstring.
 
-        current_section = self._identify_section("")  # Start with summary section
-        current_content = []
+        Yields:
+        str: A formatted section, possibly empty.
+        """
+        stripped_lines = [line.strip() for line in lines]
+        current_section = self._empty_section  # Start with summary section
+        current_content: List[str] = []
 
-        for line in lines:
-            section = self._identify_section(line)
+        for line, stripped_line in zip(lines, stripped_lines):
+            section = self._identify_section(stripped_line)
             if section and section != current_section:
                 if current_section or current_content:
-                    formatted_sections.append(
-                        self._format_section(current_section, current_content)
-                    )
+                    yield self._format_section(current_section, current_content)
                 current_section = section
                 current_content = []
             else:
                 current_content.append(line)
 
         if current_section or current_content:
-            formatted_sections.append(
-                self._format_section(current_section, current_content)
-            )
+            yield self._format_section(current_section, current_content)
 
-        result = "\n\n".join(section for section in formatted_sections if section)
-        return result.strip()
-
-    def _identify_section(self, line: str) -> Optional[Dict[str, Any]]:
+    def _identify_section(self, stripped_line: str) -> Optional[Dict[str, Any]]:
         """
         Identify the section based on the line content.
 
         Parameters:
-        line (str): A line from the docstring.
+        stripped_line (str): A line from the docstring, already stripped of
+        surrounding whitespace.
 
         Returns:
         Optional[Dict[str, Any]]: The identified section configuration, or None if not found.
         """
-        stripped_line = line.strip()
-        for section in self.sections:
-            if section["marker"] == "" and stripped_line == "":
-                return section
-            if section["marker"] and stripped_line.startswith(section["marker"]):
-                return section
-        return None
+        if not stripped_line:
+            return self._empty_section
+        if self._marker_re is None or stripped_line[0] not in self._marker_initials:
+            return None
+        # Alternatives are tried in section order, so the first section whose
+        # marker starts the line wins.
+        match = self._marker_re.match(stripped_line)
+        return self._marker_map[match.group()] if match else None
 
     def _format_section(self, section: Dict[str, Any], content: List[str]) -> str:
         """
@@ -115,7 +223,8 @@ class DocstringFormatter:
         str: The formatted section.
         """
         if not section:  # Handle case with no identified section
-            return "\n".join(line.strip() for line in content if line.strip())
+            stripped_lines = (line.strip() for line in content)
+            return "\n".join(line for line in stripped_lines if line)
 
         formatted_content = []
         width = section.get("width", 72)
@@ -125,9 +234,15 @@ class DocstringFormatter:
                 self._format_code_example(content, section["code_example"])
             )
         else:
+            wrapper = self._get_wrapper(width)
             for line in content:
-                if line.strip():
-                    formatted_content.extend(wrap(line.strip(), width=width))
+                stripped_line = line.strip()
+                # Most lines already fit. Wrapping would return them as is,
+                # unless they hold tabs or other whitespace it replaces.
+                if len(stripped_line) <= width and stripped_line.isprintable():
+                    formatted_content.append(stripped_line)
+                elif stripped_line:
+                    formatted_content.extend(wrapper.wrap(stripped_line))
                 else:
                     formatted_content.append("")
 
@@ -136,6 +251,25 @@ class DocstringFormatter:
             return f"{section['marker']}\n{section_content}"
         return section_content
 
+    def _get_wrapper(self, width: int) -> TextWrapper:
+        """
+        Get the text wrapper for the given width.
+
+        Wrappers are created once per width instead of once per line, as
+        textwrap.wrap would do. They never split words, so that URLs,
+        identifiers, and hyphenated names in docstrings stay intact.
+
+        Parameters:
+        width (int): The maximum line width.
+
+        Returns:
+        TextWrapper: The text wrapper for the width.
+        """
+        return self._wrappers.get(width) or self._wrappers.setdefault(
+            width,
+            TextWrapper(width=width, break_long_words=False, break_on_hyphens=False),
+        )
+
     def _format_code_example(
         self, content: List[str], code_config: Dict[str, str]
     ) -> List[str]:
@@ -161,10 +295,12 @@ class DocstringFormatter:
             if stripped_line == start_marker:
                 in_code_block = True
                 formatted_content.append(stripped_line)
-            elif stripped_line == end_marker:
+            elif in_code_block and stripped_line == end_marker:
                 in_code_block = False
-                formatted_code = self._format_code_snippet("\n".join(code_block))
-                formatted_content.extend(formatted_code.split("\n"))
+                # Only non-empty blocks are worth a run of black.
+                if any(code_line.strip() for code_line in code_block):
+                    formatted_code = self._format_code_snippet("\n".join(code_block))
+                    formatted_content.extend(formatted_code.split("\n"))
                 formatted_content.append(stripped_line)
                 code_block = []
             elif in_code_block:
@@ -184,141 +320,470 @@ class DocstringFormatter:
         Returns:
         str: The formatted code snippet.
         """
-        with tempfile.NamedTemporaryFile(mode="w+", suffix=".py", delete=False) as temp_file:
-            temp_file.write(dedent(code_snippet))
-            temp_file.flush()
-            temp_file_path = temp_file.name
+        import black
 
+        if self._black_mode is None:
+            self._black_mode = black.Mode(line_length=88)
         try:
-            mode = black.Mode(line_length=88)
-            black.format_file_in_place(Path(temp_file_path), fast=False, mode=mode)
-
-            with open(temp_file_path, "r") as formatted_file:
-                formatted_code = formatted_file.read()
-
-            # Adjust indentation to match the original code snippet
-            original_indent = len(code_snippet) - len(code_snippet.lstrip())
-            formatted_lines = [" " * original_indent + line if line.strip() else line
-                               for line in formatted_code.splitlines()]
-            return "\n".join(formatted_lines)
-
-        except black.NothingChanged:
-            return code_snippet
+            formatted_code = black.format_str(
+                dedent(code_snippet), mode=self._black_mode
+            )
         except black.InvalidInput:
             # Handle code that cannot be parsed
             return code_snippet
-        finally:
-            os.unlink(temp_file_path)
 
+        # Adjust indentation to match the original code snippet
+        original_indent = len(code_snippet) - len(code_snippet.lstrip())
+        return indent(formatted_code, " " * original_indent).rstrip("\n")
 
-def run_black(file_path: str, config: Dict[str, Any]) -> None:
+
+def get_black_mode(config: Dict[str, Any]) -> "black.Mode":
     """
-    Run black on the specified file.
+    Build the black mode described by the configuration.
 
     Parameters:
-    file_path (str): Path to the file to be formatted.
-    config (Dict[str, Any]): Configuration for black.
+    config (Dict[str, Any]): Configuration dictionary.
+
+    Returns:
+    black.Mode: The mode to format files with.
     """
+    import black
+
     black_config = config.get("black", {})
     line_length = black_config.get("line_length", 88)
     target_version = black_config.get("target_version", ["py38"])
 
-    mode = black.Mode(
+    return black.Mode(
         line_length=line_length,
         target_versions={black.TargetVersion[v.upper()] for v in target_version},
     )
 
-    black.format_file_in_place(Path(file_path), fast=False, mode=mode)
+
+def get_isort_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract the isort settings from the configuration.
+
+    Parameters:
+    config (Dict[str, Any]): Configuration dictionary.
+
+    Returns:
+    Dict[str, Any]: Keyword arguments for isort.
+    """
+    return config.get("isort", {})
+
+
+def run_black(file_path: str, mode: "black.Mode") -> None:
+    """
+    Run black on the specified file.
+
+    Parameters:
+    file_path (str): Path to the file to be formatted.
+    mode (black.Mode): The black mode, see get_black_mode.
+    """
+    import black
+
+    black.format_file_in_place(
+        Path(file_path), fast=False, mode=mode, write_back=black.WriteBack.YES
+    )
 
 
-def run_isort(file_path: str, config: Dict[str, Any]) -> None:
+def run_isort(file_path: str, isort_config: Dict[str, Any]) -> None:
     """
     Run isort on the specified file.
 
     Parameters:
     file_path (str): Path to the file to be formatted.
-    config (Dict[str, Any]): Configuration for isort.
+    isort_config (Dict[str, Any]): Keyword arguments for isort.
     """
-    isort_config = config.get("isort", {})
+    import isort
+
     isort.file(file_path, **isort_config)
 
 
-class DocstringTransformer(ast.NodeTransformer):
+def _black_str(source: str, mode: "black.Mode") -> str:
+    """
+    Run black on a string of source code.
+
+    Parameters:
+    source (str): The source code to be formatted.
+    mode (black.Mode): The black mode, see get_black_mode.
+
+    Returns:
+    str: The formatted source code.
+    """
+    import black
+
+    try:
+        return black.format_str(source, mode=mode)
+    except black.InvalidInput:
+        # Report invalid code as a SyntaxError, as ast.parse does when the
+        # docstring pass runs first.
+        ast.parse(source)
+        raise
+
+
+def _isort_str(source: str, isort_config: Dict[str, Any]) -> str:
+    """
+    Run isort on a string of source code.
+
+    Parameters:
+    source (str): The source code to be formatted.
+    isort_config (Dict[str, Any]): Keyword arguments for isort.
+
+    Returns:
+    str: The source code with sorted imports.
+    """
+    import isort
+
+    return isort.code(source, **isort_config)
+
+
+# Nodes that can start with a docstring.
+_DOCSTRING_OWNERS = (ast.Module, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+# Nodes that hold statements, and therefore possibly function or class
+# definitions: compound statements, except handlers, and match cases.
+_STATEMENT_CONTAINERS = tuple(
+    getattr(ast, name)
+    for name in (
+        "FunctionDef",
+        "AsyncFunctionDef",
+        "ClassDef",
+        "If",
+        "For",
+        "AsyncFor",
+        "While",
+        "With",
+        "AsyncWith",
+        "Try",
+        "TryStar",
+        "Match",
+        "excepthandler",
+        "match_case",
+    )
+    if hasattr(ast, name)
+)
+
+
+# pylint: disable=too-few-public-methods
+class DocstringTransformer:
     """
     AST transformer to modify docstrings in the parsed code.
+
+    Besides rewriting the tree, the transformer records every formatted
+    docstring together with its original string node, so that the new
+    docstrings can be spliced into the source with replace_docstrings.
     """
 
     def __init__(self, formatter: DocstringFormatter):
         self.formatter = formatter
+        self.docstrings: List[Tuple[ast.Constant, str]] = []
 
-    def visit_FunctionDef(self, node):
+    def visit(self, node: ast.AST) -> ast.AST:
         """
-        Visit a function definition node and format its docstring.
+        Format the docstrings of a node and of all definitions nested in it.
+
+        The tree is walked with an explicit stack that only enters nodes
+        holding statements, rather than dispatching on every node
+        recursively like ast.NodeTransformer.
 
         Parameters:
-        node (ast.FunctionDef): The function definition node.
+        node (ast.AST): The node to transform, usually an ast.Module.
 
         Returns:
-        ast.FunctionDef: The modified function definition node.
+        ast.AST: The modified node.
         """
-        self.generic_visit(node)
-        if ast.get_docstring(node):
-            docstring = ast.get_docstring(node)
-            formatted_docstring = self.formatter.format_docstring(docstring)
-            node.body[0] = ast.Expr(ast.Str(formatted_docstring))
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if isinstance(current, _DOCSTRING_OWNERS):
+                self._format_docstring(current)
+            stack.extend(
+                child
+                for child in ast.iter_child_nodes(current)
+                if isinstance(child, _STATEMENT_CONTAINERS)
+            )
         return node
 
-    def visit_ClassDef(self, node):
+    def _format_docstring(self, node):
         """
-        Visit a class definition node and format its docstring.
+        Format the docstring of a module, class, or function node in place.
 
         Parameters:
-        node (ast.ClassDef): The class definition node.
-
-        Returns:
-        ast.ClassDef: The modified class definition node.
+        node (ast.AST): A node that may start with a docstring.
         """
-        self.generic_visit(node)
-        if ast.get_docstring(node):
-            docstring = ast.get_docstring(node)
-            formatted_docstring = self.formatter.format_docstring(docstring)
-            node.body[0] = ast.Expr(ast.Str(formatted_docstring))
-        return node
+        # The checks of ast.get_docstring, without its node type validation.
+        if not node.body:
+            return
+        first = node.body[0]
+        if not (
+            isinstance(first, ast.Expr)
+            and isinstance(first.value, ast.Constant)
+            and isinstance(first.value.value, str)
+            and first.value.value
+        ):
+            return
+        formatted_docstring = self.formatter.format_raw_docstring(first.value.value)
+        if formatted_docstring is not None:
+            self.docstrings.append((first.value, formatted_docstring))
+            # The node keeps its source location for replace_docstrings.
+            first.value.value = formatted_docstring
+
+
+_LINE_BREAK_RE = re.compile(r"\r\n|\r|\n")
+
+_LONE_CR_RE = re.compile(r"\r(?!\n)")
+
+_UNSAFE_DOCSTRING_CHARS_RE = re.compile(r"[\\\x00-\x08\x0b-\x1f\x7f]")
+
+
+def _escape_docstring_char(match: re.Match[str]) -> str:
+    """
+    Escape a character that cannot appear verbatim in a docstring literal.
+
+    Parameters:
+    match (re.Match[str]): Match of a single backslash or control character.
+
+    Returns:
+    str: The escape sequence for the character.
+    """
+    char = match.group()
+    return "\\\\" if char == "\\" else f"\\x{ord(char):02x}"
+
+
+def _docstring_literal(docstring: str, indentation: str) -> str:
+    """
+    Render a docstring as a triple-quoted string literal.
+
+    Parameters:
+    docstring (str): The docstring text.
+    indentation (str): Indentation for the continuation lines.
+
+    Returns:
+    str: The string literal evaluating to the docstring.
+    """
+    body = _UNSAFE_DOCSTRING_CHARS_RE.sub(_escape_docstring_char, docstring)
+    if body.endswith('"'):
+        body = body[:-1] + '\\"'
+    body = body.replace('"""', '""\\"')
+    lines = body.split("\n")
+    body = "\n".join(
+        [lines[0]] + [indentation + line if line else line for line in lines[1:]]
+    )
+    return f'"""{body}"""'
 
-    visit_AsyncFunctionDef = visit_FunctionDef
+
+def replace_docstrings(source: str, docstrings: List[Tuple[ast.Constant, str]]) -> str:
+    """
+    Splice formatted docstrings into the source code.
+
+    Only the docstring literals are rewritten, so the rest of the source,
+    including comments, is left untouched.
+
+    Parameters:
+    source (str): The source code the docstring nodes were parsed from.
+    docstrings (List[Tuple[ast.Constant, str]]): Original docstring nodes
+    and their formatted text, as collected by DocstringTransformer.
+
+    Returns:
+    str: The source code with the formatted docstrings.
+    """
+    if not docstrings:
+        return source
+
+    # Line numbers count line breaks as the tokenizer does, so a lone "\r"
+    # ends a line as well as "\n" and "\r\n".
+    line_starts = [0]
+    line_starts.extend(match.end() for match in _LINE_BREAK_RE.finditer(source))
+
+    def offset(lineno: int, col_offset: int) -> int:
+        # AST column offsets count UTF-8 bytes, not characters.
+        line_start = line_starts[lineno - 1]
+        prefix = source[line_start : line_start + col_offset]
+        return line_start + len(prefix.encode("utf-8")[:col_offset].decode("utf-8"))
+
+    pieces = []
+    last_end = 0
+    for node, docstring in sorted(docstrings, key=lambda item: item[0].lineno):
+        start = offset(node.lineno, node.col_offset)
+        end = offset(node.end_lineno, node.end_col_offset)
+        line_start = line_starts[node.lineno - 1]
+        line = source[line_start:start]
+        indentation = line[: len(line) - len(line.lstrip())]
+        literal = _docstring_literal(docstring, indentation)
+        if source[start:end] != literal:
+            pieces.append(source[last_end:start])
+            pieces.append(literal)
+            last_end = end
+    pieces.append(source[last_end:])
+    return "".join(pieces)
+
+
+def format_source(
+    source: str,
+    config: Dict[str, Any],
+    mode: Optional["black.Mode"] = None,
+    isort_config: Optional[Dict[str, Any]] = None,
+    formatter: Optional[DocstringFormatter] = None,
+) -> str:
+    """
+    Format source code using black, isort, and custom docstring formatting.
+
+    Parameters:
+    source (str): The source code to be formatted.
+    config (Dict[str, Any]): Configuration dictionary.
+    mode (Optional[black.Mode]): Prebuilt black mode (default: from config).
+    isort_config (Optional[Dict[str, Any]]): Prebuilt isort settings
+    (default: from config).
+    formatter (Optional[DocstringFormatter]): Docstring formatter to reuse,
+    and with it its cache (default: a new one from config).
+
+    Returns:
+    str: The formatted source code.
+    """
+    if mode is None:
+        mode = get_black_mode(config)
+    if isort_config is None:
+        isort_config = get_isort_config(config)
+    if formatter is None:
+        formatter = DocstringFormatter(config)
+
+    # Python reads a lone "\r" as a line break, but black cannot parse it.
+    if "\r" in source:
+        source = _LONE_CR_RE.sub("\n", source)
+
+    # Format docstrings. Docstrings are triple-quoted in practice, and a
+    # substring scan is much cheaper than building the AST of a file that
+    # has none.
+    if '"""' in source or "'''" in source:
+        tree = ast.parse(source)
+        transformer = DocstringTransformer(formatter)
+        transformer.visit(tree)
+        source = replace_docstrings(source, transformer.docstrings)
+
+    # Run black and isort
+    source = _black_str(source, mode)
+    return _isort_str(source, isort_config)
 
 
-def format_file(file_path: str, config: Dict[str, Any]) -> None:
+def format_file(
+    file_path: str,
+    config: Dict[str, Any],
+    mode: Optional["black.Mode"] = None,
+    isort_config: Optional[Dict[str, Any]] = None,
+    formatter: Optional[DocstringFormatter] = None,
+) -> str:
     """
     Format a single file using black, isort, and custom docstring formatting.
 
+    The file is read once, formatted in memory, and only written back if the
+    formatting changed it.
+
     Parameters:
     file_path (str): Path to the file to be formatted.
     config (Dict[str, Any]): Configuration dictionary.
+    mode (Optional[black.Mode]): Prebuilt black mode (default: from config).
+    isort_config (Optional[Dict[str, Any]]): Prebuilt isort settings
+    (default: from config).
+    formatter (Optional[DocstringFormatter]): Docstring formatter to reuse,
+    and with it its cache (default: a new one from config).
+
+    Returns:
+    str: The formatted source code, as now stored in the file.
     """
-    # Format docstrings
     with open(file_path, "r", encoding="utf-8") as file:
-        tree = ast.parse(file.read())
+        source = file.read()
 
-    formatter = DocstringFormatter(config)
-    transformer = DocstringTransformer(formatter)
-    modified_tree = transformer.visit(tree)
+    formatted_source = format_source(source, config, mode, isort_config, formatter)
 
-    with open(file_path, "w", encoding="utf-8") as file:
-        file.write(ast.unparse(modified_tree))
+    if formatted_source != source:
+        with open(file_path, "w", encoding="utf-8") as file:
+            file.write(formatted_source)
+    return formatted_source
 
-    # Run black and isort
-    run_black(file_path, config)
-    run_isort(file_path, config)
+
+# Formatting state of a pool worker process, set up once by _init_worker.
+_WORKER_STATE: Dict[str, Any] = {}
+
+
+def _init_worker(config: Dict[str, Any]) -> None:
+    """
+    Prepare a worker process of the format_files pool.
+
+    The black mode, isort settings, and docstring formatter are built once
+    per worker rather than once per file, which also lets the formatter's
+    caches carry over between the files a worker formats.
+
+    Parameters:
+    config (Dict[str, Any]): Configuration dictionary.
+    """
+    _WORKER_STATE.update(
+        config=config,
+        mode=get_black_mode(config),
+        isort_config=get_isort_config(config),
+        formatter=DocstringFormatter(config),
+    )
+
+
+def _format_in_worker(file_path: str) -> None:
+    """
+    Format a single file in a worker process of the format_files pool.
+
+    Parameters:
+    file_path (str): Path to the file to be formatted.
+    """
+    # The formatted source is not returned, so that it is not sent back to
+    # the parent process.
+    format_file(file_path, **_WORKER_STATE)
 
 
-def format_files(file_paths: List[str], config: Dict[str, Any]) -> None:
+def format_files(
+    file_paths: List[str],
+    config: Dict[str, Any],
+    jobs: Optional[int] = None,
+    use_cache: bool = False,
+) -> None:
     """
     Format multiple files using black, isort, and custom docstring formatting.
 
+    Files are independent of each other, so they are spread over a pool of
+    worker processes when more than one job is allowed.
+
     Parameters:
     file_paths (List[str]): List of file paths to be formatted.
     config (Dict[str, Any]): Configuration dictionary.
+    jobs (Optional[int]): Number of worker processes (default: CPU count).
+    use_cache (bool): Skip files that are unchanged since they were last
+    formatted with the same configuration, see blackplus.cache.
     """
-    for file_path in file_paths:
-        format_file(file_path, config)
+    cache = Cache(config) if use_cache else None
+    if cache is not None:
+        file_paths = [path for path in file_paths if not cache.is_formatted(path)]
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(file_paths) <= 1:
+        mode = get_black_mode(config)
+        isort_config = get_isort_config(config)
+        formatter = DocstringFormatter(config)
+        for file_path in file_paths:
+            format_file(
+                file_path,
+                config,
+                mode=mode,
+                isort_config=isort_config,
+                formatter=formatter,
+            )
+    else:
+        # Workers beyond one per file would only be started to sit idle.
+        jobs = min(jobs, len(file_paths))
+        chunksize = max(1, len(file_paths) // (4 * jobs))
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_worker, initargs=(config,)
+        ) as executor:
+            # Consume the results so that worker exceptions are re-raised here.
+            for _ in executor.map(_format_in_worker, file_paths, chunksize=chunksize):
+                pass
+
+    if cache is not None:
+        cache.update(file_paths)
+        cache.write()
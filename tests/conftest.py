@@ -0,0 +1,29 @@
+"""
+tests/conftest.py
+
+This module contains pytest fixtures shared by the BlackPlus tests.
+"""
+
+import copy
+import os
+
+import pytest
+
+from blackplus.formatter import read_config
+
+PYPROJECT_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "pyproject.toml")
+
+@pytest.fixture(scope="session")
+def pyproject_path():
+    """Provide the path of the project's pyproject.toml, independent of the working directory."""
+    return PYPROJECT_PATH
+
+@pytest.fixture(scope="session")
+def shared_config(pyproject_path):
+    """Parse the BlackPlus configuration of the project once per test session."""
+    return read_config(pyproject_path)
+
+@pytest.fixture
+def config(shared_config):
+    """Provide each test with its own copy of the project configuration."""
+    return copy.deepcopy(shared_config)
@@ -0,0 +1,124 @@
+"""
+tests/test_cache.py
+
+This module contains unit tests for the BlackPlus cache of formatted files.
+"""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from blackplus.cache import Cache, file_entry, get_cache_dir, hash_file
+from blackplus.formatter import format_files
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Keep the cache files of each test in a temporary directory."""
+    monkeypatch.setenv("BLACKPLUS_CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+def test_get_cache_dir(cache_dir, monkeypatch):
+    """Test the cache directory lookup."""
+    assert get_cache_dir() == str(cache_dir)
+
+    monkeypatch.delenv("BLACKPLUS_CACHE_DIR")
+    monkeypatch.setenv("XDG_CACHE_HOME", "/xdg")
+    assert get_cache_dir() == os.path.join("/xdg", "blackplus")
+
+def test_cache_roundtrip(tmp_path):
+    """Test that formatted files are remembered until they change."""
+    file_path = tmp_path / "sample.py"
+    file_path.write_text("x = 1\n")
+
+    cache = Cache({"some": "config"})
+    assert not cache.is_formatted(str(file_path))
+    cache.update([str(file_path)])
+    cache.write()
+
+    cache = Cache({"some": "config"})
+    assert cache.entries == {str(file_path): file_entry(str(file_path))}
+    assert cache.is_formatted(str(file_path))
+    assert not Cache({"other": "config"}).is_formatted(str(file_path))
+
+    file_path.write_text("x = 22\n")
+    assert not cache.is_formatted(str(file_path))
+
+def test_cache_stat_fast_path(tmp_path):
+    """Test that only files with a new modification time are hashed."""
+    file_path = tmp_path / "sample.py"
+    file_path.write_text("x = 1\n")
+    cache = Cache({})
+    cache.update([str(file_path)])
+
+    with patch("blackplus.cache.hash_file", wraps=hash_file) as mock_hash_file:
+        assert cache.is_formatted(str(file_path))
+        mock_hash_file.assert_not_called()
+
+        # Touched but unchanged files are hashed once, then the new time is kept
+        mtime_ns = file_path.stat().st_mtime_ns + 10**9
+        os.utime(file_path, ns=(mtime_ns, mtime_ns))
+        assert cache.is_formatted(str(file_path))
+        assert cache.is_formatted(str(file_path))
+        assert mock_hash_file.call_count == 1
+
+        # Changes that keep the size are found by the hash
+        file_path.write_text("x = 2\n")
+        os.utime(file_path, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+        assert not cache.is_formatted(str(file_path))
+
+def test_cache_missing_and_corrupt_files(tmp_path, cache_dir):
+    """Test that missing files and corrupt cache files are handled."""
+    cache = Cache({})
+    cache.update([str(tmp_path / "missing.py")])
+    assert cache.entries == {}
+
+    cache.entries[str(tmp_path / "missing.py")] = [0, 0, "0" * 32]
+    assert not cache.is_formatted(str(tmp_path / "missing.py"))
+
+    # Entries in an older format are ignored
+    (tmp_path / "old.py").write_text("")
+    cache.entries[str(tmp_path / "old.py")] = "0" * 32
+    assert not cache.is_formatted(str(tmp_path / "old.py"))
+
+    os.makedirs(cache_dir)
+    with open(cache.path, "w") as cache_file:
+        cache_file.write("not json")
+    assert Cache({}).entries == {}
+
+def test_cache_write_unwritable_dir(tmp_path, monkeypatch, config):
+    """Test that a cache directory that cannot be created does not fail formatting."""
+    blocker = tmp_path / "blocker"
+    blocker.write_text("")
+    monkeypatch.setenv("BLACKPLUS_CACHE_DIR", str(blocker / "cache"))
+    file_path = tmp_path / "sample.py"
+    file_path.write_text("def  f( x ):\n  return x\n")
+
+    format_files([str(file_path)], config, use_cache=True)
+
+    assert file_path.read_text() == "def f(x):\n    return x\n"
+
+def test_cache_write_replace_failure(cache_dir):
+    """Test that the temporary file is removed when the cache cannot be replaced."""
+    cache = Cache({})
+    with patch("blackplus.cache.os.replace", side_effect=OSError("denied")):
+        cache.write()
+    assert os.listdir(cache_dir) == []
+
+def test_format_files_skips_cached_files(tmp_path, config):
+    """Test that format_files only formats files changed since the last run."""
+    file_path = tmp_path / "sample.py"
+    file_path.write_text("def  f( x ):\n  return x\n")
+
+    format_files([str(file_path)], config, use_cache=True)
+    assert file_path.read_text() == "def f(x):\n    return x\n"
+
+    with patch("blackplus.formatter.format_file") as mock_format_file:
+        format_files([str(file_path)], config, use_cache=True)
+        mock_format_file.assert_not_called()
+
+        format_files([str(file_path)], config, use_cache=False)
+        mock_format_file.assert_called_once()
+
+if __name__ == "__main__":
+    pytest.main()
@@ -6,125 +6,132 @@ This module contains unit tests for the BlackPlus CLI functionality.
 
 import pytest
 import os
-import tempfile
-from unittest.mock import patch, MagicMock
-from blackplus.cli import parse_arguments, get_python_files, main
-
-def test_parse_arguments():
+import sys
+from blackplus.cli import parse_arguments, get_python_files, iter_python_files, main
+
+pytestmark = pytest.mark.filterwarnings("ignore::PendingDeprecationWarning")
+
+@pytest.mark.parametrize(
+    "argv,expected",
+    [
+        (
+            ['blackplus', 'file1.py', 'file2.py', '--config', 'custom_config.toml'],
+            {'paths': ['file1.py', 'file2.py'], 'config': 'custom_config.toml'},
+        ),
+        (
+            ['blackplus', 'file1.py', '--jobs', '4', '--no-cache'],
+            {'paths': ['file1.py'], 'jobs': 4, 'no_cache': True},
+        ),
+        (
+            ['blackplus', 'directory/'],
+            {'paths': ['directory/'], 'config': 'pyproject.toml', 'jobs': os.cpu_count(), 'no_cache': False},
+        ),
+    ],
+    ids=["config", "jobs_no_cache", "defaults"],
+)
+def test_parse_arguments(monkeypatch, argv, expected):
     """Test the argument parsing functionality."""
-    with patch('sys.argv', ['blackplus', 'file1.py', 'file2.py', '--config', 'custom_config.toml']):
-        args = parse_arguments()
-        assert args.paths == ['file1.py', 'file2.py']
-        assert args.config == 'custom_config.toml'
-
-    with patch('sys.argv', ['blackplus', 'directory/']):
-        args = parse_arguments()
-        assert args.paths == ['directory/']
-        assert args.config == 'pyproject.toml'
-
-def test_get_python_files():
+    monkeypatch.setattr(sys, 'argv', argv)
+    args = parse_arguments()
+    assert {name: getattr(args, name) for name in expected} == expected
+
+@pytest.mark.parametrize("jobs", ["0", "-2", "many"])
+def test_parse_arguments_invalid_jobs(monkeypatch, capsys, jobs):
+    """Test that a job count that is not a positive integer is a usage error."""
+    monkeypatch.setattr(sys, 'argv', ['blackplus', 'file1.py', '--jobs', jobs])
+    with pytest.raises(SystemExit) as exc_info:
+        parse_arguments()
+    assert exc_info.value.code == 2
+    assert "must be a positive integer" in capsys.readouterr().err
+
+def touch(path):
+    """Create an empty file without building a Python file object."""
+    fd = os.open(path, os.O_CREAT | os.O_WRONLY, 0o644)
+    os.close(fd)
+
+def test_get_python_files(tmp_path):
     """Test the function for finding Python files."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Create some test files
-        open(os.path.join(tmpdir, 'file1.py'), 'w').close()
-        open(os.path.join(tmpdir, 'file2.txt'), 'w').close()
-        os.mkdir(os.path.join(tmpdir, 'subdir'))
-        open(os.path.join(tmpdir, 'subdir', 'file3.py'), 'w').close()
-
-        # Test with a single file
-        assert get_python_files([os.path.join(tmpdir, 'file1.py')]) == [os.path.join(tmpdir, 'file1.py')]
-
-        # Test with a directory
-        python_files = get_python_files([tmpdir])
-        assert len(python_files) == 2
-        assert os.path.join(tmpdir, 'file1.py') in python_files
-        assert os.path.join(tmpdir, 'subdir', 'file3.py') in python_files
-
-        # Test with mixed input
-        mixed_input = [os.path.join(tmpdir, 'file1.py'), os.path.join(tmpdir, 'subdir')]
-        python_files = get_python_files(mixed_input)
-        assert len(python_files) == 2
-        assert os.path.join(tmpdir, 'file1.py') in python_files
-        assert os.path.join(tmpdir, 'subdir', 'file3.py') in python_files
-
-@patch('blackplus.cli.read_config')
-@patch('blackplus.cli.format_files')
-@patch('blackplus.cli.get_python_files')
-def test_main_success(mock_get_python_files, mock_format_files, mock_read_config):
+    tmpdir = str(tmp_path)
+    # Create some test files
+    file1 = os.path.join(tmpdir, 'file1.py')
+    file3 = os.path.join(tmpdir, 'subdir', 'file3.py')
+    os.makedirs(os.path.join(tmpdir, 'subdir'), exist_ok=True)
+    for path in (file1, os.path.join(tmpdir, 'file2.txt'), file3):
+        touch(path)
+    expected = frozenset((file1, file3))
+
+    # Test with a single file
+    assert get_python_files([file1]) == [file1]
+
+    # Test with a directory
+    assert set(get_python_files([tmpdir])) == expected
+
+    # Test with mixed input
+    assert set(get_python_files([file1, os.path.join(tmpdir, 'subdir')])) == expected
+
+def test_iter_python_files(tmp_path):
+    """Test that Python files are found lazily, directory by directory."""
+    tmpdir = str(tmp_path)
+    os.mkdir(os.path.join(tmpdir, 'subdir'))
+    open(os.path.join(tmpdir, 'subdir', 'file2.py'), 'w').close()
+    open(os.path.join(tmpdir, 'file1.py'), 'w').close()
+    os.symlink(os.path.join(tmpdir, 'subdir'), os.path.join(tmpdir, 'link'))
+
+    python_files = iter_python_files([tmpdir])
+    assert next(python_files) == os.path.join(tmpdir, 'file1.py')
+    assert list(python_files) == [os.path.join(tmpdir, 'subdir', 'file2.py')]
+
+def stub_main(monkeypatch, argv, python_files, **errors):
+    """Replace the functions main calls with stubs that record their calls."""
+    calls = {}
+
+    def stub(name, result):
+        def record(*args, **kwargs):
+            calls.setdefault(name, []).append((args, kwargs))
+            if name in errors:
+                raise errors[name]
+            return result
+        monkeypatch.setattr(f'blackplus.cli.{name}', record)
+
+    stub('read_config', {'some': 'config'})
+    stub('get_python_files', python_files)
+    stub('format_files', None)
+    monkeypatch.setattr(sys, 'argv', argv)
+    return calls
+
+def test_main_success(monkeypatch):
     """Test the main function with successful execution."""
-    mock_get_python_files.return_value = ['file1.py', 'file2.py']
-    mock_read_config.return_value = {'some': 'config'}
-
-    with patch('sys.argv', ['blackplus', 'file1.py', 'file2.py']):
+    calls = stub_main(monkeypatch, ['blackplus', 'file1.py', 'file2.py'], ['file1.py', 'file2.py'])
+
+    main()
+
+    assert calls['read_config'] == [(('pyproject.toml',), {})]
+    assert calls['get_python_files'] == [((['file1.py', 'file2.py'],), {})]
+    assert calls['format_files'] == [
+        ((['file1.py', 'file2.py'], {'some': 'config'}), {'jobs': os.cpu_count(), 'use_cache': True})
+    ]
+
+@pytest.mark.parametrize(
+    "python_files,errors,expected_code",
+    [
+        (['file1.py'], {'read_config': FileNotFoundError()}, 1),
+        (['file1.py'], {'read_config': ValueError("Invalid configuration")}, 1),
+        ([], {}, 0),
+        (['file1.py'], {'format_files': ValueError("Formatting error")}, 1),
+        (['file1.py'], {'format_files': IOError("I/O error")}, 1),
+        (['file1.py'], {'format_files': Exception("Unexpected error")}, 1),
+    ],
+    ids=["config_not_found", "config_error", "no_python_files", "formatting_error", "io_error", "unexpected_error"],
+)
+def test_main_exit_codes(monkeypatch, python_files, errors, expected_code):
+    """Test the exit code of the main function when it cannot format the files."""
+    calls = stub_main(monkeypatch, ['blackplus', 'file1.py'], python_files, **errors)
+
+    with pytest.raises(SystemExit) as exc_info:
         main()
-
-    mock_read_config.assert_called_once_with('pyproject.toml')
-    mock_get_python_files.assert_called_once_with(['file1.py', 'file2.py'])
-    mock_format_files.assert_called_once_with(['file1.py', 'file2.py'], {'some': 'config'})
-
-@patch('blackplus.cli.read_config')
-def test_main_config_not_found(mock_read_config):
-    """Test the main function when the config file is not found."""
-    mock_read_config.side_effect = FileNotFoundError()
-
-    with patch('sys.argv', ['blackplus', 'file1.py']):
-        with pytest.raises(SystemExit) as exc_info:
-            main()
-        assert exc_info.value.code == 1
-
-@patch('blackplus.cli.read_config')
-@patch('blackplus.cli.get_python_files')
-def test_main_no_python_files(mock_get_python_files, mock_read_config):
-    """Test the main function when no Python files are found."""
-    mock_get_python_files.return_value = []
-    mock_read_config.return_value = {'some': 'config'}
-
-    with patch('sys.argv', ['blackplus', 'empty_dir/']):
-        with pytest.raises(SystemExit) as exc_info:
-            main()
-        assert exc_info.value.code == 0
-
-@patch('blackplus.cli.read_config')
-@patch('blackplus.cli.get_python_files')
-@patch('blackplus.cli.format_files')
-def test_main_formatting_error(mock_format_files, mock_get_python_files, mock_read_config):
-    """Test the main function when a formatting error occurs."""
-    mock_get_python_files.return_value = ['file1.py']
-    mock_read_config.return_value = {'some': 'config'}
-    mock_format_files.side_effect = ValueError("Formatting error")
-
-    with patch('sys.argv', ['blackplus', 'file1.py']):
-        with pytest.raises(SystemExit) as exc_info:
-            main()
-        assert exc_info.value.code == 1
-
-@patch('blackplus.cli.read_config')
-@patch('blackplus.cli.get_python_files')
-@patch('blackplus.cli.format_files')
-def test_main_io_error(mock_format_files, mock_get_python_files, mock_read_config):
-    """Test the main function when an I/O error occurs."""
-    mock_get_python_files.return_value = ['file1.py']
-    mock_read_config.return_value = {'some': 'config'}
-    mock_format_files.side_effect = IOError("I/O error")
-
-    with patch('sys.argv', ['blackplus', 'file1.py']):
-        with pytest.raises(SystemExit) as exc_info:
-            main()
-        assert exc_info.value.code == 1
-
-@patch('blackplus.cli.read_config')
-@patch('blackplus.cli.get_python_files')
-@patch('blackplus.cli.format_files')
-def test_main_unexpected_error(mock_format_files, mock_get_python_files, mock_read_config):
-    """Test the main function when an unexpected error occurs."""
-    mock_get_python_files.return_value = ['file1.py']
-    mock_read_config.return_value = {'some': 'config'}
-    mock_format_files.side_effect = Exception("Unexpected error")
-
-    with patch('sys.argv', ['blackplus', 'file1.py']):
-        with pytest.raises(SystemExit) as exc_info:
-            main()
-        assert exc_info.value.code == 1
+    assert exc_info.value.code == expected_code
+    if not python_files:
+        assert 'format_files' not in calls
 
 if __name__ == "__main__":
     pytest.main()
\ No newline at end of file
@@ -6,45 +6,30 @@ This module contains unit tests for the BlackPlus formatter functionality.
 
 import pytest
 import os
-import tempfile
+import shutil
+import subprocess
+import sys
 import ast
-from unittest.mock import patch, MagicMock
-from blackplus.formatter import DocstringFormatter, read_config, format_file, format_files, run_black, run_isort, DocstringTransformer
-
-def test_read_config():
-    """Test the read_config function with a sample configuration."""
-    with tempfile.NamedTemporaryFile(mode="w+", suffix=".toml", delete=False) as temp_file:
-        temp_file.write('''
-[tool.blackplus.docstrings]
-sections = [
-    {name = "Summary", marker = "", width = 72},
-    {name = "Parameters", marker = "Parameters:", width = 72},
-    {name = "Returns", marker = "Returns:", width = 72},
-    {name = "Example", marker = "Example:", width = 72, code_example = {start_marker = "```python", end_marker = "```"}},
-]
-''')
-        temp_file.flush()
-        config = read_config(temp_file.name)
-        assert "docstrings" in config
-        assert "sections" in config["docstrings"]
-        assert len(config["docstrings"]["sections"]) == 4
-    os.unlink(temp_file.name)
-
-def test_docstring_formatter_basic():
-    """Test the DocstringFormatter class with a basic docstring."""
-    config = {
-        "docstrings": {
-            "sections": [
-                {"name": "Summary", "marker": "", "width": 72},
-                {"name": "Parameters", "marker": "Parameters:", "width": 72},
-                {"name": "Returns", "marker": "Returns:", "width": 72},
-                {"name": "Example", "marker": "Example:", "width": 72, "code_example": {"start_marker": "```python", "end_marker": "```"}},
-            ]
-        }
+import functools
+import black
+import isort
+from unittest.mock import ANY, patch
+from blackplus.formatter import DocstringFormatter, read_config, format_file, format_files, format_source, run_black, run_isort, DocstringTransformer, get_black_mode, get_isort_config, replace_docstrings, _load_config, _init_worker, _format_in_worker
+
+pytestmark = pytest.mark.filterwarnings("ignore::PendingDeprecationWarning")
+
+DOCSTRING_CONFIG = {
+    "docstrings": {
+        "sections": [
+            {"name": "Summary", "marker": "", "width": 72},
+            {"name": "Parameters", "marker": "Parameters:", "width": 72},
+            {"name": "Returns", "marker": "Returns:", "width": 72},
+            {"name": "Example", "marker": "Example:", "width": 72, "code_example": {"start_marker": "```python", "end_marker": "```"}},
+        ]
     }
-    formatter = DocstringFormatter(config)
-    
-    sample_docstring = '''
+}
+
+SAMPLE_DOCSTRING = '''
     This function does something.
 
     Parameters:
@@ -54,28 +39,8 @@ def test_docstring_formatter_basic():
     Returns:
     bool: A boolean value.
     '''
-    
-    formatted_docstring = formatter.format_docstring(sample_docstring)
-    
-    assert "This function does something." in formatted_docstring
-    assert "Parameters:" in formatted_docstring
-    assert "Returns:" in formatted_docstring
 
-def test_docstring_formatter_with_code_examples():
-    """Test the DocstringFormatter class with code examples in docstrings."""
-    config = {
-        "docstrings": {
-            "sections": [
-                {"name": "Summary", "marker": "", "width": 72},
-                {"name": "Parameters", "marker": "Parameters:", "width": 72},
-                {"name": "Returns", "marker": "Returns:", "width": 72},
-                {"name": "Example", "marker": "Example:", "width": 72, "code_example": {"start_marker": "```python", "end_marker": "```"}},
-            ]
-        }
-    }
-    formatter = DocstringFormatter(config)
-    
-    sample_docstring = '''
+CODE_EXAMPLE_DOCSTRING = '''
     This function calculates the area.
 
     Example:
@@ -84,79 +49,208 @@ def test_docstring_formatter_with_code_examples():
     print("Area:", area)
     ```
     '''
+
+@pytest.fixture(scope="module")
+def formatter():
+    """Share one DocstringFormatter, which only caches results, across the module."""
+    return DocstringFormatter(DOCSTRING_CONFIG)
+
+def assert_contains_all(content, needles):
+    """Assert that every needle occurs in content, reporting all missing ones."""
+    missing = [needle for needle in needles if needle not in content]
+    assert not missing, f"missing {missing} in {content!r}"
+
+def test_read_config(tmp_path):
+    """Test the read_config function with a sample configuration."""
+    path = tmp_path / "pyproject.toml"
+    path.write_text('''
+[tool.blackplus.docstrings]
+sections = [
+    {name = "Summary", marker = "", width = 72},
+    {name = "Parameters", marker = "Parameters:", width = 72},
+    {name = "Returns", marker = "Returns:", width = 72},
+    {name = "Example", marker = "Example:", width = 72, code_example = {start_marker = "```python", end_marker = "```"}},
+]
+''')
+    config = read_config(str(path))
+    assert "docstrings" in config
+    assert "sections" in config["docstrings"]
+    assert len(config["docstrings"]["sections"]) == 4
+
+def test_read_config_invalid(tmp_path):
+    """Test that invalid TOML raises the ValueError the CLI reports."""
+    path = tmp_path / "pyproject.toml"
+    path.write_text("[tool.blackplus\n")
+
+    with pytest.raises(ValueError):
+        read_config(str(path))
+
+def test_read_config_cache(pyproject_path):
+    """Test that read_config parses an unchanged file only once."""
+    config = read_config(pyproject_path)
+    config["docstrings"]["sections"].clear()
+    hits = _load_config.cache_info().hits
+
+    assert read_config(pyproject_path)["docstrings"]["sections"]
+    assert _load_config.cache_info().hits == hits + 1
+
+def test_docstring_formatter_basic(formatter):
+    """Test the DocstringFormatter class with a basic docstring."""
+    formatted_docstring = formatter.format_docstring(SAMPLE_DOCSTRING)
     
-    formatted_docstring = formatter.format_docstring(sample_docstring)
-    
-    assert "Example:" in formatted_docstring
-    assert "```python" in formatted_docstring
-    assert "area = calculate_area(5)" in formatted_docstring
-    assert "print(\"Area:\", area)" in formatted_docstring
-    assert "```" in formatted_docstring
+    assert_contains_all(formatted_docstring, ("This function does something.", "Parameters:", "Returns:"))
 
-def test_docstring_formatter_identify_section():
-    """Test the _identify_section method of DocstringFormatter."""
-    config = {
-        "docstrings": {
-            "sections": [
-                {"name": "Summary", "marker": "", "width": 72},
-                {"name": "Parameters", "marker": "Parameters:", "width": 72},
-            ]
-        }
-    }
-    formatter = DocstringFormatter(config)
+    # Windows line endings give the same result
+    assert formatter.format_docstring(SAMPLE_DOCSTRING.replace("\n", "\r\n")) == formatted_docstring
 
+def test_docstring_formatter_with_code_examples(formatter):
+    """Test the DocstringFormatter class with code examples in docstrings."""
+    formatted_docstring = formatter.format_docstring(CODE_EXAMPLE_DOCSTRING)
+    
+    assert_contains_all(formatted_docstring, (
+        "Example:",
+        "```python",
+        "area = calculate_area(5)",
+        "print(\"Area:\", area)",
+        "```",
+    ))
+
+def test_docstring_formatter_format_code_example(formatter):
+    """Test that only non-empty blocks between the code markers are formatted."""
+    code_config = {"start_marker": "```python", "end_marker": "```"}
+
+    with patch.object(formatter, "_format_code_snippet", wraps=formatter._format_code_snippet) as mock_snippet:
+        # Fences of other languages are left alone
+        assert formatter._format_code_example(["```text", "raw", "```"], code_config) == ["```text", "raw", "```"]
+        # Empty blocks are not passed to black
+        assert formatter._format_code_example(["```python", "   ", "```"], code_config) == ["```python", "```"]
+        mock_snippet.assert_not_called()
+
+        assert formatter._format_code_example(["```python", "x=1", "```"], code_config) == ["```python", "x = 1", "```"]
+        mock_snippet.assert_called_once_with("x=1")
+
+def test_docstring_formatter_format_code_snippet():
+    """Test that code snippets are formatted with black and keep their indentation."""
+    formatter = DocstringFormatter({})
+
+    assert formatter._format_code_snippet("    area=calculate_area( 5 )") == "    area = calculate_area(5)"
+    assert formatter._format_code_snippet("def incomplete_code(") == "def incomplete_code("
+
+def test_docstring_formatter_cache():
+    """Test that identical docstrings and code snippets are only formatted once."""
+    formatter = DocstringFormatter({"docstrings": {"sections": [{"name": "Summary", "marker": "", "width": 72}]}})
+
+    with patch.object(formatter, "_format_section", wraps=formatter._format_section) as mock_format_section:
+        first = formatter.format_docstring("Does something.")
+        second = formatter.format_docstring("Does something.")
+    assert first == second == "Does something."
+    assert mock_format_section.call_count == 1
+
+    formatter._format_code_snippet("x=1")
+    formatter._format_code_snippet("x=1")
+    assert formatter._format_code_snippet.cache_info().hits == 1
+
+def test_docstring_formatter_without_markers(formatter):
+    """Test that docstrings without section markers skip the line-by-line split."""
+    with patch.object(formatter, "_iter_formatted_sections") as mock_iter_sections:
+        assert formatter.format_docstring("  Does   something.\n\n  More details.  ") == "Does   something.\n\nMore details."
+    mock_iter_sections.assert_not_called()
+
+    # Markers are still found mid-line, where they do not start a section,
+    # and after any kind of line break
+    assert formatter.format_docstring("Mentions Parameters: mid-line.") == "Mentions Parameters: mid-line."
+    assert formatter.format_docstring("Summary.\rParameters:\rx (int): X.") == "Summary.\n\nParameters:\nx (int): X."
+
+def test_docstring_formatter_format_raw_docstring():
+    """Test that raw docstrings are cleaned, formatted, and cached by their source text."""
+    formatter = DocstringFormatter(DOCSTRING_CONFIG)
+
+    with patch.object(formatter, "format_docstring", wraps=formatter.format_docstring) as mock_format_docstring:
+        assert formatter.format_raw_docstring("Summary.\n    Indented line.\n    ") == "Summary.\nIndented line."
+        assert formatter.format_raw_docstring("Summary.\n    Indented line.\n    ") == "Summary.\nIndented line."
+        assert formatter.format_raw_docstring("") is None
+    mock_format_docstring.assert_called_once_with("Summary.\nIndented line.")
+
+def test_docstring_formatter_identify_section(formatter):
+    """Test the _identify_section method of DocstringFormatter."""
     assert formatter._identify_section("") == {"name": "Summary", "marker": "", "width": 72}
     assert formatter._identify_section("Parameters:") == {"name": "Parameters", "marker": "Parameters:", "width": 72}
     assert formatter._identify_section("Unknown:") is None
+    assert formatter._identify_section("Parameters: extra")["name"] == "Parameters"
+    assert DocstringFormatter({})._identify_section("Parameters:") is None
 
-def test_docstring_formatter_format_section():
+def test_docstring_formatter_format_section(formatter):
     """Test the _format_section method of DocstringFormatter."""
-    config = {
-        "docstrings": {
-            "sections": [
-                {"name": "Summary", "marker": "", "width": 72},
-                {"name": "Parameters", "marker": "Parameters:", "width": 72},
-            ]
-        }
-    }
-    formatter = DocstringFormatter(config)
+    # Wrappers exist for the configured widths before any section is formatted
+    assert set(DocstringFormatter(DOCSTRING_CONFIG)._wrappers) == {72}
 
     section = {"name": "Summary", "marker": "", "width": 10}
     content = ["This is a long summary that should be wrapped."]
     formatted = formatter._format_section(section, content)
     assert "This is a\nlong\nsummary\nthat\nshould be\nwrapped." in formatted
 
+    content = ["See https://example.com/a-long-url for self-documenting details."]
+    formatted = formatter._format_section(section, content)
+    assert formatted.split("\n") == ["See", "https://example.com/a-long-url", "for", "self-documenting", "details."]
+
+    section = {"name": "Summary", "marker": "", "width": 72}
+    content = ["fits  as is", "tab\tfits", ""]
+    formatted = formatter._format_section(section, content)
+    assert formatted == "fits  as is\ntab     fits"
+
     section = {"name": "Parameters", "marker": "Parameters:", "width": 72}
     content = ["param1 (int): An integer parameter.", "param2 (str): A string parameter."]
     formatted = formatter._format_section(section, content)
     assert formatted.startswith("Parameters:")
-    assert "param1 (int): An integer parameter." in formatted
-    assert "param2 (str): A string parameter." in formatted
+    assert_contains_all(formatted, ("param1 (int): An integer parameter.", "param2 (str): A string parameter."))
 
-@patch('blackplus.formatter.black.format_file_in_place')
+@patch('black.format_file_in_place')
 def test_run_black(mock_format_file_in_place):
     """Test the run_black function."""
     config = {"black": {"line_length": 100, "target_version": ["py38"]}}
-    run_black("test_file.py", config)
+    mode = get_black_mode(config)
+    assert mode.line_length == 100
+    run_black("test_file.py", mode)
     mock_format_file_in_place.assert_called_once()
 
-@patch('blackplus.formatter.isort.file')
+@patch('isort.file')
 def test_run_isort(mock_isort_file):
     """Test the run_isort function."""
     config = {"isort": {"profile": "black"}}
-    run_isort("test_file.py", config)
+    run_isort("test_file.py", get_isort_config(config))
     mock_isort_file.assert_called_once_with("test_file.py", profile="black")
 
-def test_docstring_transformer():
+def test_run_black_writes_file(tmp_path):
+    """Test that run_black writes the formatted code back to the file."""
+    path = tmp_path / "sample.py"
+    path.write_text("x=( 1 )\n")
+    run_black(str(path), get_black_mode({}))
+    assert path.read_text() == "x = 1\n"
+
+def test_format_source(config):
+    """Test formatting source code in memory."""
+    formatted = format_source("import sys\nimport os\ndef  f(x):\n  return x\n", config)
+    assert formatted == "import os\nimport sys\n\n\ndef f(x):\n    return x\n"
+
+def test_formatter_imports_black_and_isort_lazily():
+    """Test that importing the formatter does not import black or isort."""
+    code = (
+        "import sys, blackplus.formatter\n"
+        "assert 'black' not in sys.modules and 'isort' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=os.path.dirname(os.path.dirname(__file__)))
+
+@patch('blackplus.formatter.DocstringTransformer')
+def test_format_source_without_docstrings(mock_transformer, config):
+    """Test that sources without triple quotes skip the docstring pass."""
+    assert format_source("def  f( ):\n  return 'x'\n", config) == "def f():\n    return \"x\"\n"
+    mock_transformer.assert_not_called()
+
+    with pytest.raises(SyntaxError):
+        format_source("def f(:\n", config)
+
+def test_docstring_transformer(formatter):
     """Test the DocstringTransformer class."""
-    config = {
-        "docstrings": {
-            "sections": [
-                {"name": "Summary", "marker": "", "width": 72},
-            ]
-        }
-    }
-    formatter = DocstringFormatter(config)
     transformer = DocstringTransformer(formatter)
 
     # Test function docstring transformation
@@ -177,139 +271,121 @@ class TestClass:
     transformed_class = transformer.visit(class_node.body[0])
     assert ast.get_docstring(transformed_class) == "This is a test class."
 
-@patch('blackplus.formatter.run_black')
-@patch('blackplus.formatter.run_isort')
-def test_format_file(mock_run_isort, mock_run_black):
-    """Test the format_file function."""
-    config = {
-        "docstrings": {
-            "sections": [
-                {"name": "Summary", "marker": "", "width": 72},
-            ]
-        }
-    }
-    with tempfile.NamedTemporaryFile(mode="w+", suffix=".py", delete=False) as temp_file:
-        temp_file.write('''
-def test_func():
-    """This is a test function."""
-    pass
+    # Test docstrings of definitions nested in compound statements
+    nested_node = ast.parse('''
+def outer():
+    """Outer docstring."""
+    if True:
+        def inner():
+            """   Inner docstring.   """
 ''')
-        temp_file.flush()
-        format_file(temp_file.name, config)
-        mock_run_black.assert_called_once_with(temp_file.name, config)
-        mock_run_isort.assert_called_once_with(temp_file.name, config)
-    os.unlink(temp_file.name)
-
-def test_format_file_functions():
-    """Test formatting of functions in a Python file."""
-    config = read_config("pyproject.toml")
-    
-    unformatted_code = '''
-def  calculate_area(radius):
-  """This function calculates the area of a circle given its radius.
-  The formula used is: area = pi * radius^2
-  Parameters:
-  radius (float): The radius of the circle for which the area will be calculated
-  Returns:
-  float: The area of the circle.
-  Example:
-      ```python
-        area = calculate_area( 5 )
-        print( "Area:",area )
-      ```
-  """
-  pi = 3.141592653589793
-  area=pi*radius*radius
-  return area
-'''
-    with tempfile.NamedTemporaryFile(mode="w+", suffix=".py", delete=False) as temp_file:
-        temp_file.write(unformatted_code)
-        temp_file.flush()
-        
-        format_file(temp_file.name, config)
-        
-        with open(temp_file.name, "r") as formatted_file:
-            formatted_content = formatted_file.read()
-        
-        # Check for correct function definition formatting
-        assert "def calculate_area(radius):" in formatted_content
-        # Check for formatted docstring
-        assert '"""' in formatted_content
-        assert "This function calculates the area of a circle given its radius." in formatted_content
-        assert "Parameters:" in formatted_content
-        assert "Returns:" in formatted_content
-        assert "Example:" in formatted_content
-        # Check code example formatting (content should remain unchanged)
-        assert "```python" in formatted_content
-        assert "area = calculate_area( 5 )" in formatted_content
-        assert "print( \"Area:\",area )" in formatted_content
-        assert "```" in formatted_content
-    
-    os.unlink(temp_file.name)
+    transformer.visit(nested_node)
+    inner = nested_node.body[0].body[1].body[0]
+    assert ast.get_docstring(inner, clean=False) == "Inner docstring."
+    assert inner.body[0].lineno == 6
 
-def test_format_file_classes():
-    """Test formatting of classes and methods in a Python file."""
-    config = read_config("pyproject.toml")
-    
-    unformatted_code = '''
-class  MyClass:
-    """This is a sample class with methods that do simple operations.
-    It demonstrates poor formatting in docstrings and code.
-    Attributes:
-    value (int): An integer value associated with the class.
-    Example:
-        ```python
-            obj = MyClass( 42 )
-            obj.increment_value( )
-            print( obj.value )
-        ```
-    """
-    def __init__(self,value):
-        self.value=value
+    handler_node = ast.parse('''
+try:
+    pass
+except ImportError:
+    class Fallback:
+        """   Fallback docstring.   """
+''')
+    transformer.visit(handler_node)
+    fallback = handler_node.body[0].handlers[0].body[0]
+    assert ast.get_docstring(fallback, clean=False) == "Fallback docstring."
+
+def test_replace_docstrings(formatter):
+    """Test that formatted docstrings are spliced into the source code."""
+    source = '''"""
+Module docstring.
+"""
+# A comment that must survive
+class Ünïcode: """Class docstring."""  # trailing comment
 
-    def increment_value(self):
-      """Increments the value by one."""
-      self.value=self.value+1
+def untouched():
+    """Already formatted."""
+'''
+    tree = ast.parse(source)
+    transformer = DocstringTransformer(formatter)
+    transformer.visit(tree)
+    assert len(transformer.docstrings) == 3
+
+    result = replace_docstrings(source, transformer.docstrings)
+    assert result.startswith('"""Module docstring."""\n# A comment that must survive\n')
+    assert 'class Ünïcode: """Class docstring."""  # trailing comment' in result
+    assert '    """Already formatted."""' in result
+    assert ast.get_docstring(ast.parse(result)) == "Module docstring."
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        'def f():\r    """Doc   string.\r    more."""\r    return 1\r',
+        'x = 1  # note\ry = 2\ndef f():\n    """Doc   string.\n    more."""\n    return 1\n',
+        'x = 1\r\ndef f():\r\n    """Doc   string.\r\n    more."""\r\n    return 1\r\n',
+    ],
+    ids=["cr", "mixed", "crlf"],
+)
+def test_format_source_line_endings(source, config):
+    """Test that docstrings are spliced at the right place with any line endings."""
+    formatted = format_source(source, config)
+    assert ast.get_docstring(ast.parse(formatted).body[-1]) == "Doc   string.\nmore."
+    assert "return 1" in formatted
+
+def test_replace_docstrings_lone_carriage_returns():
+    """Test that replace_docstrings counts lines as the tokenizer does."""
+    source = 'x = 1  # note\ry = 2\ndef f():\n    """Doc   x."""\n'
+    node = ast.parse(source).body[2].body[0].value
+    assert replace_docstrings(source, [(node, "Doc x.")]) == 'x = 1  # note\ry = 2\ndef f():\n    """Doc x."""\n'
+
+def test_replace_docstrings_escapes_literals():
+    """Test that docstrings with quotes and backslashes stay valid literals."""
+    source = r'''def f():
+    """Ends with quotes "" and has a \\ backslash\""""
+'''
+    node = ast.parse(source).body[0]
+    docstring = ast.get_docstring(node)
+    result = replace_docstrings(source, [(node.body[0].value, docstring)])
+    assert ast.get_docstring(ast.parse(result).body[0]) == docstring
 
-    def multiply_value(self,factor):
-          """Multiplies the value by the given factor and returns the result."""
-          return self.value*factor
+SAMPLE = '''
+def test_func():
+    """This is a test function."""
+    pass
 '''
-    with tempfile.NamedTemporaryFile(mode="w+", suffix=".py", delete=False) as temp_file:
-        temp_file.write(unformatted_code)
-        temp_file.flush()
-        
-        format_file(temp_file.name, config)
-        
-        with open(temp_file.name, "r") as formatted_file:
-            formatted_content = formatted_file.read()
-        
-        # Check for correct class definition formatting
-        assert "class MyClass:" in formatted_content
-        # Check for formatted docstring (content should remain unchanged)
-        assert '"""' in formatted_content
-        assert "This is a sample class with methods that do simple operations." in formatted_content
-        assert "Attributes:" in formatted_content
-        assert "Example:" in formatted_content
-        # Check method formatting
-        assert "def __init__(self, value):" in formatted_content
-        assert "def increment_value(self):" in formatted_content
-        assert "def multiply_value(self, factor):" in formatted_content
-        # Check code example formatting (content should remain unchanged)
-        assert "```python" in formatted_content
-        assert "obj = MyClass( 42 )" in formatted_content
-        assert "obj.increment_value( )" in formatted_content
-        assert "print( obj.value )" in formatted_content
-        assert "```" in formatted_content
-    
-    os.unlink(temp_file.name)
 
-def test_format_file_full_script():
-    """Test formatting of the entire unformatted example script."""
-    config = read_config("pyproject.toml")
-    
-    # Replace this string with the unformatted example code (without triple backticks)
-    unformatted_code = '''
+@patch('blackplus.formatter._black_str', side_effect=lambda source, mode: source)
+@patch('blackplus.formatter._isort_str', side_effect=lambda source, isort_config: source)
+def test_format_file(mock_isort_str, mock_black_str, tmp_path, shared_config):
+    """Test the format_file function."""
+    path = tmp_path / "sample.py"
+    path.write_text(SAMPLE)
+
+    assert format_file(str(path), shared_config) == SAMPLE
+
+    mock_black_str.assert_called_once_with(ANY, get_black_mode(shared_config))
+    mock_isort_str.assert_called_once_with(ANY, get_isort_config(shared_config))
+
+@patch('isort.file')
+@patch('black.format_file_in_place')
+def test_format_file_single_pass(mock_format_file_in_place, mock_isort_file, tmp_path, config):
+    """Test that format_file parses and formats each file in memory once."""
+    path = tmp_path / "sample.py"
+    path.write_text(SAMPLE)
+
+    with patch('blackplus.formatter.ast.parse', wraps=ast.parse) as mock_parse, \
+            patch('black.format_str', wraps=black.format_str) as mock_format_str, \
+            patch('isort.code', wraps=isort.code) as mock_isort_code:
+        formatted_content = format_file(str(path), config)
+
+    assert mock_parse.call_count == 1
+    assert mock_format_str.call_count == 1
+    assert mock_isort_code.call_count == 1
+    mock_format_file_in_place.assert_not_called()
+    mock_isort_file.assert_not_called()
+    assert formatted_content == path.read_text() == SAMPLE.lstrip("\n")
+
+FUNCTION_SOURCE = '''
 def  calculate_area(radius):
   """This function calculates the area of a circle given its radius.
   The formula used is: area = pi * radius^2
@@ -326,7 +402,9 @@ def  calculate_area(radius):
   pi = 3.141592653589793
   area=pi*radius*radius
   return area
+'''
 
+COMPLEX_FUNCTION_SOURCE = '''
 def   complex_function(x,   y):
       """Performs a complex calculation on two numbers and returns the result which includes addition, subtraction, multiplication, and division.
       Parameters:
@@ -345,7 +423,9 @@ def   complex_function(x,   y):
       results['multiply' ]=x*y
       results['divide']=x / y
       return results
+'''
 
+CLASS_SOURCE = '''
 class  MyClass:
     """This is a sample class with methods that do simple operations.
     It demonstrates poor formatting in docstrings and code.
@@ -369,89 +449,15 @@ class  MyClass:
           """Multiplies the value by the given factor and returns the result."""
           return self.value*factor
 '''
-    with tempfile.NamedTemporaryFile(mode="w+", suffix=".py", delete=False) as temp_file:
-        temp_file.write(unformatted_code)
-        temp_file.flush()
-        
-        format_file(temp_file.name, config)
-        
-        with open(temp_file.name, "r") as formatted_file:
-            formatted_content = formatted_file.read()
-        
-        # Check that all functions and classes are correctly formatted
-        assert "def calculate_area(radius):" in formatted_content
-        assert "def complex_function(x, y):" in formatted_content
-        assert "class MyClass:" in formatted_content
-        # Additional checks can be added here for docstrings and code examples
-    
-    os.unlink(temp_file.name)
 
-def test_format_files_multiple():
-    """Test the format_files function with multiple sample Python files."""
-    config = read_config("pyproject.toml")
-    
-    temp_files = []
-    for i in range(3):
-        unformatted_code = f'''
-def   function_{i}(param):
-  """This function does something with param {i}.
-  Parameters:
-  param (int): An integer parameter.
-  Returns:
-  str: A string value.
-  """
-  return f"Result {{param}}"
-'''
-        with tempfile.NamedTemporaryFile(mode="w+", suffix=".py", delete=False) as temp_file:
-            temp_file.write(unformatted_code)
-            temp_file.flush()
-            temp_files.append(temp_file.name)
-    
-    format_files(temp_files, config)
-    
-    for file_path in temp_files:
-        with open(file_path, "r") as formatted_file:
-            formatted_content = formatted_file.read()
-        
-        # Check for correct function definition formatting
-        function_name = f"function_{temp_files.index(file_path)}"
-        assert f"def {function_name}(param):" in formatted_content
-        # Check for formatted docstring
-        assert '"""' in formatted_content
-        assert f"This function does something with param {temp_files.index(file_path)}." in formatted_content
-        assert "Parameters:" in formatted_content
-        assert "Returns:" in formatted_content
-        
-        os.unlink(file_path)
-
-def test_edge_cases():
-    """Test various edge cases in formatting."""
-    config = read_config("pyproject.toml")
-    formatter = DocstringFormatter(config)
-    
-    # Edge case: Missing docstring
-    sample_code_no_docstring = '''
+FULL_SCRIPT_SOURCE = FUNCTION_SOURCE + COMPLEX_FUNCTION_SOURCE + CLASS_SOURCE
+
+NO_DOCSTRING_SOURCE = '''
 def function_without_docstring(param):
     pass
 '''
-    with tempfile.NamedTemporaryFile(mode="w+", suffix=".py", delete=False) as temp_file:
-        temp_file.write(sample_code_no_docstring)
-        temp_file.flush()
-        
-        format_file(temp_file.name, config)
-        
-        with open(temp_file.name, "r") as formatted_file:
-            formatted_content = formatted_file.read()
-        
-        # Ensure the function is still present and correctly formatted
-        assert "def function_without_docstring(param):" in formatted_content
-        # Since there was no docstring, nothing should be added
-        assert formatted_content.count('"""') == 0
-    
-    os.unlink(temp_file.name)
-    
-    # Edge case: Invalid code example in docstring
-    invalid_code_example = '''
+
+INVALID_CODE_EXAMPLE_SOURCE = '''
 def function_with_invalid_example():
     """Function with invalid code example.
 
@@ -462,93 +468,238 @@ def function_with_invalid_example():
     """
     pass
 '''
-    with tempfile.NamedTemporaryFile(mode="w+", suffix=".py", delete=False) as temp_file:
-        temp_file.write(invalid_code_example)
-        temp_file.flush()
-        
-        format_file(temp_file.name, config)
-        
-        with open(temp_file.name, "r") as formatted_file:
-            formatted_content = formatted_file.read()
-        
-        # Ensure that the docstring is still present
-        assert '"""' in formatted_content
-        assert "Function with invalid code example." in formatted_content
-        # Check that the invalid code example is handled gracefully
-        assert "Example:" in formatted_content
-        assert "```python" in formatted_content
-        assert "def incomplete_code(" in formatted_content
-        assert "```" in formatted_content
-    
-    os.unlink(temp_file.name)
 
-def test_formatting_preserves_code_behavior():
-    """Ensure that formatting does not change code behavior."""
-    config = read_config("pyproject.toml")
-    
-    unformatted_code = '''
+FORMAT_SOURCE_CASES = (
+    (
+        FUNCTION_SOURCE,
+        (
+            # Function definition formatting
+            "def calculate_area(radius):",
+            # Formatted docstring
+            '"""',
+            "This function calculates the area of a circle given its radius.",
+            "Parameters:",
+            "Returns:",
+            "Example:",
+            # Code example formatting (content should remain unchanged)
+            "```python",
+            "area = calculate_area( 5 )",
+            "print( \"Area:\",area )",
+            "```",
+        ),
+        (),
+    ),
+    (
+        CLASS_SOURCE,
+        (
+            # Class definition formatting
+            "class MyClass:",
+            # Formatted docstring (content should remain unchanged)
+            '"""',
+            "This is a sample class with methods that do simple operations.",
+            "Attributes:",
+            "Example:",
+            # Method formatting
+            "def __init__(self, value):",
+            "def increment_value(self):",
+            "def multiply_value(self, factor):",
+            # Code example formatting (content should remain unchanged)
+            "```python",
+            "obj = MyClass( 42 )",
+            "obj.increment_value( )",
+            "print( obj.value )",
+            "```",
+        ),
+        (),
+    ),
+    (
+        FULL_SCRIPT_SOURCE,
+        (
+            "def calculate_area(radius):",
+            "def complex_function(x, y):",
+            "class MyClass:",
+        ),
+        (),
+    ),
+    (
+        NO_DOCSTRING_SOURCE,
+        ("def function_without_docstring(param):",),
+        # Since there was no docstring, nothing should be added
+        ('"""',),
+    ),
+    (
+        INVALID_CODE_EXAMPLE_SOURCE,
+        (
+            # The docstring is still present
+            '"""',
+            "Function with invalid code example.",
+            # The invalid code example is handled gracefully
+            "Example:",
+            "```python",
+            "def incomplete_code(",
+            "```",
+        ),
+        (),
+    ),
+)
+
+@pytest.mark.parametrize(
+    "source,expected,unexpected",
+    FORMAT_SOURCE_CASES,
+    ids=("functions", "classes", "full_script", "no_docstring", "invalid_code_example"),
+)
+def test_format_source_cases(source, expected, unexpected, config):
+    """Test formatting of sample sources with functions, classes, and edge cases."""
+    formatted_content = format_source(source, config)
+
+    assert_contains_all(formatted_content, expected)
+    for needle in unexpected:
+        assert needle not in formatted_content
+
+MULTIPLE_FILES_TEMPLATE = '''
+def   function_{i}(param):
+  """This function does something with param {i}.
+  Parameters:
+  param (int): An integer parameter.
+  Returns:
+  str: A string value.
+  """
+  return f"Result {{param}}"
+'''
+
+@pytest.fixture(scope="module")
+def sample_py_files(tmp_path_factory):
+    """Write the unformatted sample files once per module."""
+    directory = tmp_path_factory.mktemp("samples")
+    paths = []
+    for i in range(3):
+        path = directory / f"f{i}.py"
+        path.write_text(MULTIPLE_FILES_TEMPLATE.format(i=i))
+        paths.append(str(path))
+    return paths
+
+def test_format_files_multiple(sample_py_files, tmp_path, config):
+    """Test the format_files function with multiple sample Python files."""
+    # Format copies, as format_files rewrites the shared samples in place
+    temp_files = [
+        shutil.copyfile(sample, tmp_path / os.path.basename(sample))
+        for sample in sample_py_files
+    ]
+
+    format_files([str(path) for path in temp_files], config)
+
+    for i, file_path in enumerate(temp_files):
+        formatted_content = file_path.read_text()
+
+        assert_contains_all(formatted_content, (
+            f"def function_{i}(param):",
+            '"""',
+            f"This function does something with param {i}.",
+            "Parameters:",
+            "Returns:",
+        ))
+
+PARALLEL_SOURCE = '''
+def  parallel_function(param):
+  """This function is formatted in a worker process."""
+  return param
+'''
+
+def test_format_files_parallel(tmp_path, config):
+    """Test that format_files gives the same result with a process pool."""
+    temp_files = []
+    for i in range(3):
+        path = tmp_path / f"sample_{i}.py"
+        path.write_text(PARALLEL_SOURCE)
+        temp_files.append(str(path))
+
+    format_files(temp_files[:1], config, jobs=1)
+    format_files(temp_files[1:], config, jobs=2)
+
+    formatted_contents = [(tmp_path / f"sample_{i}.py").read_text() for i in range(3)]
+    assert "def parallel_function(param):" in formatted_contents[0]
+    assert formatted_contents[1] == formatted_contents[0]
+    assert formatted_contents[2] == formatted_contents[0]
+
+@patch('blackplus.formatter.ProcessPoolExecutor')
+def test_format_files_pool_size(mock_executor, config):
+    """Test that the pool never starts more workers than there are files."""
+    format_files(["file1.py", "file2.py"], config, jobs=8)
+    assert mock_executor.call_args.kwargs["max_workers"] == 2
+
+def test_format_files_parallel_error(tmp_path, config):
+    """Test that an error in a worker process is raised by format_files."""
+    paths = [tmp_path / "valid.py", tmp_path / "broken.py"]
+    paths[0].write_text("x = 1\n")
+    paths[1].write_text("def broken(:\n")
+
+    with pytest.raises(SyntaxError):
+        format_files([str(path) for path in paths], config, jobs=2)
+
+@patch('blackplus.formatter.format_file')
+def test_worker_state(mock_format_file, config, monkeypatch):
+    """Test that pool workers build their formatting state once."""
+    monkeypatch.setattr("blackplus.formatter._WORKER_STATE", {})
+    _init_worker(config)
+    _format_in_worker("file1.py")
+    _format_in_worker("file2.py")
+
+    formatter = mock_format_file.call_args.kwargs["formatter"]
+    assert isinstance(formatter, DocstringFormatter)
+    mock_format_file.assert_any_call(
+        "file1.py", config=config, mode=get_black_mode(config), isort_config={}, formatter=formatter
+    )
+    mock_format_file.assert_any_call(
+        "file2.py", config=config, mode=get_black_mode(config), isort_config={}, formatter=formatter
+    )
+
+ADD_NUMBERS_SOURCE = '''
 def add_numbers(a,b):
   """Adds two numbers together."""
   return a+  b
 '''
-    with tempfile.NamedTemporaryFile(mode="w+", suffix=".py", delete=False) as temp_file:
-        temp_file.write(unformatted_code)
-        temp_file.flush()
-        
-        # Save original output
-        original_result = {}
-        exec(unformatted_code, original_result)
-        original_output = original_result['add_numbers'](2, 3)
-        
-        format_file(temp_file.name, config)
-        
-        with open(temp_file.name, "r") as formatted_file:
-            formatted_content = formatted_file.read()
-        
-        # Execute formatted code
-        formatted_result = {}
-        exec(formatted_content, formatted_result)
-        formatted_output = formatted_result['add_numbers'](2, 3)
-        
-        # Check that outputs are the same
-        assert original_output == formatted_output
-    
-    os.unlink(temp_file.name)
 
-def test_handling_of_syntax_errors():
-    """Test how the formatter handles files with syntax errors."""
-    config = read_config("pyproject.toml")
-    
-    code_with_syntax_error = '''
+@functools.lru_cache(maxsize=128)
+def _compile(source):
+    """Compile a test source once, however many tests execute it."""
+    return compile(source, "<blackplus-test>", "exec")
+
+def test_formatting_preserves_code_behavior(config):
+    """Ensure that formatting does not change code behavior."""
+    # Save original output
+    original_result = {}
+    exec(_compile(ADD_NUMBERS_SOURCE), original_result)
+    original_output = original_result['add_numbers'](2, 3)
+
+    formatted_content = format_source(ADD_NUMBERS_SOURCE, config)
+
+    # Execute formatted code
+    formatted_result = {}
+    exec(_compile(formatted_content), formatted_result)
+    formatted_output = formatted_result['add_numbers'](2, 3)
+
+    # Check that outputs are the same
+    assert original_output == formatted_output
+
+SYNTAX_ERROR_SOURCE = '''
 def broken_function():
     print("This function has a syntax error"
 '''
-    with tempfile.NamedTemporaryFile(mode="w+", suffix=".py", delete=False) as temp_file:
-        temp_file.write(code_with_syntax_error)
-        temp_file.flush()
-        
-        # Attempt to format the file
-        try:
-            format_file(temp_file.name, config)
-            assert False, "Expected an exception due to syntax error, but none occurred."
-        except SyntaxError:
-            pass  # Expected outcome
-        except Exception as e:
-            assert False, f"Unexpected exception type: {e}"
-        finally:
-            os.unlink(temp_file.name)
-
-def test_format_file_nonexistent_path():
+
+def test_handling_of_syntax_errors(config):
+    """Test how the formatter handles sources with syntax errors."""
+    with pytest.raises(SyntaxError):
+        format_source(SYNTAX_ERROR_SOURCE, config)
+
+def test_format_file_nonexistent_path(config):
     """Test formatting with a nonexistent file path."""
-    config = read_config("pyproject.toml")
     nonexistent_path = "/path/to/nonexistent/file.py"
     
     with pytest.raises(FileNotFoundError):
         format_file(nonexistent_path, config)
 
-def test_format_files_empty_list():
+def test_format_files_empty_list(config):
     """Test formatting with an empty list of files."""
-    config = read_config("pyproject.toml")
     format_files([], config)  # Should not raise an exception
 
 @patch('blackplus.formatter.format_file')
@@ -556,10 +707,13 @@ def test_format_files(mock_format_file):
     """Test the format_files function."""
     config = {}
     file_paths = ["file1.py", "file2.py"]
-    format_files(file_paths, config)
+    format_files(file_paths, config, jobs=1)
     assert mock_format_file.call_count == 2
-    mock_format_file.assert_any_call("file1.py", config)
-    mock_format_file.assert_any_call("file2.py", config)
+    mode = get_black_mode(config)
+    mock_format_file.assert_any_call("file1.py", config, mode=mode, isort_config={}, formatter=ANY)
+    mock_format_file.assert_any_call("file2.py", config, mode=mode, isort_config={}, formatter=ANY)
+    formatters = {call.kwargs["formatter"] for call in mock_format_file.call_args_list}
+    assert len(formatters) == 1
 
 if __name__ == "__main__":
     pytest.main()